@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+from lantern.config import load_config
+from lantern.embed_server import serve
+from lantern.embeddings import Embeddings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Keep the embedding model warm and serve it over a Unix socket")
+    parser.add_argument("--socket", default=None, help="Socket path (default: LANTERN_EMBED_SOCKET)")
+    args = parser.parse_args()
+
+    config = load_config()
+    socket_path = args.socket or config.embed_socket
+    if not socket_path:
+        print("No socket path configured. Set LANTERN_EMBED_SOCKET or pass --socket.")
+        return 1
+
+    # The server itself must encode in-process, so it gets no socket_path.
+    embedder = Embeddings(config.embed_model, num_threads=config.embed_threads, quantize=config.embed_quantize)
+    embedder.embed_texts(["warm up"])
+
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+    print(f"Serving {embedder.fingerprint} on {socket_path} (Ctrl-C to stop)")
+    try:
+        serve(socket_path, embedder)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,7 +9,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT / "src"))
 
 from lantern.config import load_config
-from lantern.embeddings import Embeddings
+from lantern.embeddings import CachedEmbeddings, embedder_from_config
 from lantern.ingest import ingest_documents
 from lantern.loaders.asana import load_asana_tasks
 
@@ -26,8 +26,11 @@ def main() -> int:
     if args.top_n is not None:
         tasks = tasks[: max(args.top_n, 0)]
 
-    embedder = Embeddings(config.embed_model)
-    chunk_count = ingest_documents(tasks, embedder, config)
+    embedder = CachedEmbeddings(embedder_from_config(config, use_server=False), config.chroma_dir)
+    try:
+        chunk_count = ingest_documents(tasks, embedder, config)
+    finally:
+        embedder.close()
 
     print(f"Tasks fetched: {fetched_count}")
     print(f"Tasks ingested: {len(tasks)}")
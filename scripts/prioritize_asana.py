@@ -5,6 +5,9 @@ import argparse
 import csv
 from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
+import heapq
+from operator import attrgetter
 from pathlib import Path
 import sys
 from typing import Any, Dict, List, Optional, Tuple
@@ -19,6 +22,10 @@ from lantern.vectorstore import get_collection
 PINGPONG_SECTION_DEFAULT = "1200892062747278"  # "🏓 The ball is in your court"
 
 
+# Metadata values repeat heavily across tasks (same due dates, same project
+# lists), so the pure parsers below are memoized. Chroma metadata values are
+# scalars, hence hashable.
+@lru_cache(maxsize=4096)
 def _parse_iso_date(value: Any) -> Optional[date]:
     if not value:
         return None
@@ -28,6 +35,7 @@ def _parse_iso_date(value: Any) -> Optional[date]:
         return None
 
 
+@lru_cache(maxsize=4096)
 def _parse_float(value: Any) -> Optional[float]:
     if value is None or value == "":
         return None
@@ -39,12 +47,17 @@ def _parse_float(value: Any) -> Optional[float]:
         return None
 
 
-def _split_csvish(value: Any) -> List[str]:
+@lru_cache(maxsize=4096)
+def _split_csv_str(value: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def _split_csvish(value: Any) -> Tuple[str, ...]:
     if not value:
-        return []
+        return ()
     if isinstance(value, list):
-        return [str(v).strip() for v in value if v]
-    return [part.strip() for part in str(value).split(",") if part.strip()]
+        return tuple(str(v).strip() for v in value if v)
+    return _split_csv_str(str(value))
 
 
 @dataclass
@@ -58,41 +71,24 @@ class TaskRow:
     estimated_time_yoko: Optional[float]
     assignee_gid: Optional[str]
     assignee_section_gid: Optional[str]
-    project_gids: List[str]
-    project_names: List[str]
+    project_gids: Tuple[str, ...]
+    project_names: Tuple[str, ...]
     score: float
     reasons: List[str]
     is_in_pingpong: bool
 
 
-def _fetch_all_asana_docs(config, batch_size: int = 1000) -> List[Dict[str, Any]]:
-    """Fetch all Asana docs from Chroma (non-semantic)."""
-    collection = get_collection(config.chroma_dir)
-
+def _fetch_asana_docs_paginated(collection, batch_size: int) -> List[Dict[str, Any]]:
     docs: List[Dict[str, Any]] = []
     offset = 0
 
     while True:
-        try:
-            res = collection.get(
-                where={"source_type": "asana"},
-                include=["documents", "metadatas"],
-                limit=batch_size,
-                offset=offset,
-            )
-        except TypeError:
-            # Older Chroma API: filter client-side.
-            res = collection.get(include=["documents", "metadatas"])
-            ids = res.get("ids", []) or []
-            metas = res.get("metadatas", []) or []
-            texts = res.get("documents", []) or []
-            for tid, md, text in zip(ids, metas, texts):
-                md = md or {}
-                if md.get("source_type") != "asana":
-                    continue
-                docs.append({"id": str(tid), "metadata": md, "text": text})
-            return docs
-
+        res = collection.get(
+            where={"source_type": "asana"},
+            include=["documents", "metadatas"],
+            limit=batch_size,
+            offset=offset,
+        )
         ids = res.get("ids", []) or []
         metas = res.get("metadatas", []) or []
         texts = res.get("documents", []) or []
@@ -111,6 +107,40 @@ def _fetch_all_asana_docs(config, batch_size: int = 1000) -> List[Dict[str, Any]
     return docs
 
 
+def _fetch_all_asana_docs(config, batch_size: int = 1000) -> List[Dict[str, Any]]:
+    """Fetch all Asana docs from Chroma (non-semantic).
+
+    One filtered `.get` round-trip; pages in `batch_size` windows only if that
+    runs out of memory. Embeddings are never requested.
+    """
+    collection = get_collection(config.chroma_dir)
+
+    try:
+        res = collection.get(where={"source_type": "asana"}, include=["documents", "metadatas"])
+    except MemoryError:
+        return _fetch_asana_docs_paginated(collection, batch_size)
+    except TypeError:
+        # Older Chroma API: filter client-side.
+        res = collection.get(include=["documents", "metadatas"])
+        ids = res.get("ids", []) or []
+        metas = res.get("metadatas", []) or []
+        texts = res.get("documents", []) or []
+        docs: List[Dict[str, Any]] = []
+        for tid, md, text in zip(ids, metas, texts):
+            md = md or {}
+            if md.get("source_type") != "asana":
+                continue
+            docs.append({"id": str(tid), "metadata": md, "text": text})
+        return docs
+
+    ids = res.get("ids", []) or []
+    metas = res.get("metadatas", []) or []
+    texts = res.get("documents", []) or []
+    return [
+        {"id": str(tid), "metadata": md or {}, "text": text}
+        for tid, md, text in zip(ids, metas, texts)
+    ]
+
 
 def _is_effectively_empty(value: Any) -> bool:
     if value in (None, ""):
@@ -122,13 +152,17 @@ def _is_effectively_empty(value: Any) -> bool:
     return False
 
 
-def _dedupe_by_task_gid(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _dedupe_by_task_gid(docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, date]]:
     """Collapse chunk-level records into one record per Asana task.
 
     In Chroma we store multiple chunks per task (same task metadata, different text).
     For deterministic prioritization, we want unique tasks.
+
+    Each project's end date (the max due_on across its unique tasks) is
+    returned alongside the unique docs.
     """
     by_gid: Dict[str, Dict[str, Any]] = {}
+    end_by_project: Dict[str, date] = {}
 
     for d in docs:
         md = d.get("metadata", {}) or {}
@@ -137,38 +171,29 @@ def _dedupe_by_task_gid(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             continue
 
         existing = by_gid.get(gid)
-        if existing is None:
-            by_gid[gid] = d
+        if existing is not None:
+            ex_md = existing["metadata"]
+            for k, v in md.items():
+                if v is not None and ((k not in ex_md) or _is_effectively_empty(ex_md[k])):
+                    ex_md[k] = v
             continue
 
-        ex_md = existing.get("metadata", {}) or {}
-        for k, v in md.items():
-            if v is None:
-                continue
-            if (k not in ex_md) or _is_effectively_empty(ex_md.get(k)):
-                ex_md[k] = v
-        existing["metadata"] = ex_md
-
-    return list(by_gid.values())
+        d["metadata"] = md
+        by_gid[gid] = d
 
-
-def _project_end_dates(docs: List[Dict[str, Any]]) -> Dict[str, date]:
-    """Compute project end date as max due_on across ingested tasks per project_gid."""
-    end_by_project: Dict[str, date] = {}
-
-    for d in docs:
-        md = d.get("metadata", {}) or {}
+    # After merging, so a due date found only on a later chunk still counts.
+    for d in by_gid.values():
+        md = d["metadata"]
         due = _parse_iso_date(md.get("due_on"))
         if not due:
             continue
-
         project_gids = _split_csvish(md.get("project_gids")) or _split_csvish(md.get("membership_project_gids"))
         for pgid in project_gids:
             current = end_by_project.get(pgid)
             if current is None or due > current:
                 end_by_project[pgid] = due
 
-    return end_by_project
+    return list(by_gid.values()), end_by_project
 
 
 def _score_task(
@@ -206,11 +231,57 @@ def _score_task(
     return score, reasons
 
 
+def _optional_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _is_in_pingpong(md: Dict[str, Any], pingpong_section_gid: str) -> bool:
+    return (
+        (_optional_str(md.get("assignee_section_gid")) == pingpong_section_gid)
+        or (_optional_str(md.get("assignee_section_gid_global")) == pingpong_section_gid)
+        or (pingpong_section_gid in _split_csvish(md.get("membership_section_gids")))
+    )
+
+
+def _should_skip(
+    md: Dict[str, Any],
+    args: argparse.Namespace,
+    today: date,
+    configured_user_gid: Optional[str],
+    pingpong_section_gid: str,
+) -> bool:
+    """Apply the CLI filters to raw metadata, cheapest checks first."""
+    if configured_user_gid:
+        assignee_gid = _optional_str(md.get("assignee_gid"))
+        if assignee_gid in (None, ""):
+            if not args.include_unassigned:
+                return True
+        elif assignee_gid != configured_user_gid and not args.include_not_assigned:
+            return True
+
+    completed = md.get("completed") is True
+    if completed and not args.include_completed:
+        return True
+
+    # Exclude ping-pong/blocked tasks by default.
+    if not args.include_pingpong and _is_in_pingpong(md, pingpong_section_gid):
+        return True
+
+    if completed:
+        completed_on = _parse_iso_date(md.get("completed_on"))
+        if completed_on is None or (today - completed_on).days > args.completed_lookback_days:
+            return True
+
+    return False
+
+
 def _row_from_doc(doc: Dict[str, Any], today: date, project_end: Dict[str, date], pingpong_section_gid: str) -> TaskRow:
     md = doc.get("metadata", {}) or {}
 
     gid = str(md.get("asana_task_gid") or doc.get("id") or "")
-    name = str(md.get("task_name") or md.get("name") or gid)
+    # file_name always holds the current task name. task_name is no longer
+    # written, and upserts don't delete it, so old chunks keep a stale copy.
+    name = str(md.get("file_name") or md.get("task_name") or md.get("name") or gid)
     permalink_url = str(md.get("asana_permalink_url") or md.get("permalink_url") or "")
 
     completed = bool(md.get("completed") is True)
@@ -218,17 +289,8 @@ def _row_from_doc(doc: Dict[str, Any], today: date, project_end: Dict[str, date]
     due_on = _parse_iso_date(md.get("due_on"))
     estimated_time = _parse_float(md.get("estimated_time_yoko"))
 
-    assignee_gid = md.get("assignee_gid")
-    if assignee_gid is not None:
-        assignee_gid = str(assignee_gid)
-
-    assignee_section_gid = md.get("assignee_section_gid")
-    if assignee_section_gid is not None:
-        assignee_section_gid = str(assignee_section_gid)
-
-    assignee_section_gid_global = md.get("assignee_section_gid_global")
-    if assignee_section_gid_global is not None:
-        assignee_section_gid_global = str(assignee_section_gid_global)
+    assignee_gid = _optional_str(md.get("assignee_gid"))
+    assignee_section_gid = _optional_str(md.get("assignee_section_gid"))
 
     project_gids = _split_csvish(md.get("project_gids")) or _split_csvish(md.get("membership_project_gids"))
     project_names = _split_csvish(md.get("project_names")) or _split_csvish(md.get("membership_project_names"))
@@ -241,12 +303,7 @@ def _row_from_doc(doc: Dict[str, Any], today: date, project_end: Dict[str, date]
             project_end_in_days = max((soonest_end - today).days, 0)
 
     is_overdue = bool(due_on and due_on < today and not completed)
-    membership_section_gids = _split_csvish(md.get("membership_section_gids"))
-    is_in_pingpong = (
-        (assignee_section_gid == pingpong_section_gid)
-        or (assignee_section_gid_global == pingpong_section_gid)
-        or (pingpong_section_gid in membership_section_gids)
-    )
+    is_in_pingpong = _is_in_pingpong(md, pingpong_section_gid)
     overdue_exempt = bool(is_overdue and is_in_pingpong)
 
     score, reasons = _score_task(
@@ -308,50 +365,33 @@ def main() -> int:
         today = date.today()
 
     docs = _fetch_all_asana_docs(config)
-    docs = _dedupe_by_task_gid(docs)
+    docs, project_end = _dedupe_by_task_gid(docs)
     if not docs:
         print("No Asana tasks found in Chroma. Run: python scripts/ingest_asana.py")
         return 1
 
-    project_end = _project_end_dates(docs)
+    # Only include tasks assigned to the configured user by default.
+    configured_user_gid = getattr(config, "asana_user_gid", None)
+    if configured_user_gid:
+        configured_user_gid = str(configured_user_gid)
 
     rows: List[TaskRow] = []
     for d in docs:
-        row = _row_from_doc(d, today, project_end, args.pingpong_section_gid)
-
-        # Only include tasks assigned to the configured user by default.
-        configured_user_gid = getattr(config, "asana_user_gid", None)
-        if configured_user_gid:
-            configured_user_gid = str(configured_user_gid)
-            is_unassigned = row.assignee_gid in (None, "")
-            is_assigned_to_me = (row.assignee_gid == configured_user_gid)
-            if (not is_assigned_to_me) and (not args.include_not_assigned):
-                if not is_unassigned:
-                    continue
-            if is_unassigned and (not args.include_unassigned):
-                continue
-
-        if row.completed and not args.include_completed:
-            continue
-
-        if row.completed and args.include_completed:
-            if row.completed_on is None:
-                continue
-            days_ago = (today - row.completed_on).days
-            if days_ago > args.completed_lookback_days:
-                continue
-
-        # Exclude ping-pong/blocked tasks by default.
-        if row.is_in_pingpong and (not args.include_pingpong):
+        if _should_skip(d["metadata"], args, today, configured_user_gid, args.pingpong_section_gid):
             continue
+        rows.append(_row_from_doc(d, today, project_end, args.pingpong_section_gid))
 
-        rows.append(row)
-
-    rows.sort(key=lambda r: r.score, reverse=True)
+    # Only the CSV needs the full ranking; the console shows the top N.
+    by_score = attrgetter("score")
+    if args.csv:
+        rows.sort(key=by_score, reverse=True)
+        top_rows = rows[: max(args.top, 0)]
+    else:
+        top_rows = heapq.nlargest(max(args.top, 0), rows, key=by_score)
 
     print(f"Today: {today.isoformat()} | Tasks considered: {len(rows)} | Total Asana docs: {len(docs)}")
     print("Top tasks:")
-    for idx, row in enumerate(rows[: max(args.top, 0)], start=1):
+    for idx, row in enumerate(top_rows, start=1):
         print(_format_row(idx, row))
 
     if args.csv:
@@ -1,2 +1,2 @@
-__all__ = ["config", "documents", "chunking", "embeddings", "vectorstore", "ingest", "rag", "llm"]
+__all__ = ["config", "documents", "chunking", "embeddings", "embed_server", "vectorstore", "ingest", "rag", "llm"]
 __version__ = "0.1.0"
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from .documents import Document
 
@@ -11,27 +11,26 @@ def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str
     if overlap >= chunk_size:
         raise ValueError("overlap must be smaller than chunk_size")
 
-    chunks: List[str] = []
-    start = 0
     length = len(text)
+    if length == 0:
+        return []
 
-    while start < length:
-        end = min(start + chunk_size, length)
-        chunk = text[start:end]
-        if chunk.strip():
-            chunks.append(chunk)
-        if end >= length:
-            break
-        start = end - overlap
-        if start < 0:
-            start = 0
+    # Windows start every `step` chars; the last one is the first that reaches the end.
+    step = chunk_size - overlap
+    last_start = max(-(-(length - chunk_size) // step), 0) * step
+    return [
+        chunk
+        for chunk in (text[start : start + chunk_size] for start in range(0, min(last_start + 1, length), step))
+        if not chunk.isspace()
+    ]
 
-    return chunks
 
+def chunk_documents(documents: Iterable[Document], chunk_size: int = 800, overlap: int = 100) -> Iterator[Document]:
+    """Yield one Document per chunk.
 
-def chunk_documents(documents: Iterable[Document], chunk_size: int = 800, overlap: int = 100) -> List[Document]:
-    chunked: List[Document] = []
+    Chunks share their source document's metadata dict rather than copying it;
+    treat it as read-only.
+    """
     for doc in documents:
         for chunk in chunk_text(doc.text, chunk_size=chunk_size, overlap=overlap):
-            chunked.append(Document(text=chunk, metadata=dict(doc.metadata)))
-    return chunked
+            yield Document(text=chunk, metadata=doc.metadata)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import os
 from pathlib import Path
 
@@ -13,6 +14,9 @@ class Config:
     llm_api_key: str | None
     llm_model: str
     embed_model: str
+    embed_threads: int
+    embed_quantize: bool
+    embed_socket: str | None
     chroma_dir: str
     llm_system_prompt: str
     asana_pat: str | None
@@ -21,7 +25,7 @@ class Config:
     asana_user_gid: str | None
     asana_limit: int
     asana_completed_lookback_days: int
-    excluded_section_gids: list[str]
+    excluded_section_gids: tuple[str, ...]
 
 
 def _get_env(name: str, default: str | None = None) -> str | None:
@@ -41,19 +45,34 @@ def _get_env_int(name: str, default: int) -> int:
         raise ValueError(f"Invalid integer for {name}: {value}") from exc
 
 
-def _split_csv(value: str | None) -> list[str]:
+def _get_env_bool(name: str, default: bool) -> bool:
+    value = _get_env(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _split_csv(value: str | None) -> tuple[str, ...]:
     if not value:
-        return []
-    return [v.strip() for v in value.split(",") if v.strip()]
+        return ()
+    return tuple(v.strip() for v in value.split(",") if v.strip())
 
 
+@lru_cache(maxsize=1)
 def load_config() -> Config:
+    """Read .env and the environment once per process; later calls reuse the result."""
     load_dotenv()
 
     llm_base_url = _get_env("LANTERN_LLM_BASE_URL")
     llm_api_key = _get_env("LANTERN_LLM_API_KEY")
     llm_model = _get_env("LANTERN_LLM_MODEL", "gpt-4o-mini")
     embed_model = _get_env("LANTERN_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    embed_threads = _get_env_int("LANTERN_EMBED_THREADS", 0)
+    embed_quantize = _get_env_bool("LANTERN_EMBED_QUANTIZE", False)
+    embed_socket = _get_env("LANTERN_EMBED_SOCKET", "./data/embed.sock")
+    if embed_socket.strip().lower() in {"0", "false", "no", "off"}:
+        # An empty value falls back to the default, so disabling needs a keyword.
+        embed_socket = None
     chroma_dir = _get_env("LANTERN_CHROMA_DIR", "./data/chroma")
     llm_system_prompt = (
         "You are a concise assistant. Use the provided context to answer the question. "
@@ -79,6 +98,9 @@ def load_config() -> Config:
         llm_api_key=llm_api_key,
         llm_model=llm_model or "gpt-4o-mini",
         embed_model=embed_model or "sentence-transformers/all-MiniLM-L6-v2",
+        embed_threads=embed_threads,
+        embed_quantize=embed_quantize,
+        embed_socket=embed_socket,
         chroma_dir=chroma_dir or "./data/chroma",
         llm_system_prompt=llm_system_prompt,
         asana_pat=asana_pat,
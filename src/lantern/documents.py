@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     text: str
     metadata: Dict[str, Any]
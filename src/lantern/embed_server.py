@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import struct
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .embeddings import Embeddings
+
+
+# Keep the probe short: a missing/stale socket must not slow down CLI runs.
+CONNECT_TIMEOUT = 0.1
+# Upper bound on waiting for a reply. The server handles one request at a time,
+# so a hung server or one busy with a large batch must not block callers; on
+# timeout they fall back to encoding in-process.
+READ_TIMEOUT = 30.0
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def _write_frame(stream: BinaryIO, payload: bytes) -> None:
+    stream.write(_FRAME_HEADER.pack(len(payload)))
+    stream.write(payload)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if data is None or len(data) != size:
+        raise ConnectionError("Embedding server connection closed mid-frame.")
+    return data
+
+
+def _read_frame(stream: BinaryIO) -> bytes:
+    (size,) = _FRAME_HEADER.unpack(_read_exact(stream, _FRAME_HEADER.size))
+    return _read_exact(stream, size)
+
+
+def request_embeddings(socket_path: str, fingerprint: str, texts: List[str]) -> np.ndarray | None:
+    """Ask a running embedding server to encode `texts`.
+
+    Returns None when no server is listening, it serves a different model, or
+    it does not reply within READ_TIMEOUT, so callers can fall back to encoding
+    in-process.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    sock.settimeout(READ_TIMEOUT)
+    with sock, sock.makefile("rwb") as stream:
+        try:
+            _write_frame(stream, json.dumps({"model": fingerprint, "texts": texts}).encode("utf-8"))
+            stream.flush()
+            header: Dict[str, Any] = json.loads(_read_frame(stream))
+            if "error" in header:
+                return None
+            data = _read_frame(stream)
+        except (OSError, ValueError):
+            return None
+
+    return np.frombuffer(data, dtype=np.float32).reshape(header["shape"])
+
+
+class _EmbedHandler(socketserver.StreamRequestHandler):
+    server: "_EmbedServer"
+
+    def handle(self) -> None:
+        embedder = self.server.embedder
+        try:
+            request = json.loads(_read_frame(self.rfile))
+        except (ConnectionError, ValueError):
+            return
+
+        if request.get("model") != embedder.fingerprint:
+            error = f"Server embeds with {embedder.fingerprint}, not {request.get('model')}."
+            _write_frame(self.wfile, json.dumps({"error": error}).encode("utf-8"))
+            return
+
+        texts = request.get("texts") or []
+        vectors = np.asarray(embedder.embed_texts(texts), dtype=np.float32)
+        _write_frame(self.wfile, json.dumps({"shape": list(vectors.shape)}).encode("utf-8"))
+        _write_frame(self.wfile, vectors.tobytes())
+
+
+class _EmbedServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, embedder: "Embeddings") -> None:
+        self.embedder = embedder
+        super().__init__(socket_path, _EmbedHandler)
+
+
+def serve(socket_path: str, embedder: "Embeddings") -> None:
+    """Serve embed requests on a Unix socket until interrupted.
+
+    Requests are handled one at a time; the model itself parallelizes encoding.
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with _EmbedServer(socket_path, embedder) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
@@ -1,25 +1,171 @@
 from __future__ import annotations
 
-from typing import List
+from hashlib import sha256
+from pathlib import Path
+import sqlite3
+from typing import TYPE_CHECKING, Dict, List
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from .config import Config
+from .embed_server import request_embeddings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite3"
+
+# Per-forward-pass batch inside SentenceTransformer.encode (its default is 32).
+ENCODE_BATCH_SIZE = 64
+
+# SQLite caps the number of bound parameters per statement; stay well below it.
+_CACHE_QUERY_BATCH = 500
 
 
 class Embeddings:
-    def __init__(self, model_name: str) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        num_threads: int = 0,
+        quantize: bool = False,
+        socket_path: str | None = None,
+    ) -> None:
         self.model_name = model_name
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self.socket_path = socket_path
         self._model: SentenceTransformer | None = None
 
+    @property
+    def fingerprint(self) -> str:
+        """Identify the vectors this embedder produces (model plus any variant)."""
+        fingerprint = f"{self.model_name}#norm"
+        return f"{fingerprint}#int8" if self.quantize else fingerprint
+
     def _load(self) -> SentenceTransformer:
         if self._model is None:
-            self._model = SentenceTransformer(self.model_name, device="cpu")
+            # Imported here: torch/transformers dominate startup, and runs served
+            # by the embedding server never need them.
+            from sentence_transformers import SentenceTransformer
+            import torch
+
+            if self.num_threads > 0:
+                torch.set_num_threads(self.num_threads)
+            model = SentenceTransformer(self.model_name, device="cpu")
+            if self.quantize:
+                # Swap nn.Linear GEMMs for int8 kernels (fbgemm/qnnpack) on CPU.
+                model[0].auto_model = torch.quantization.quantize_dynamic(
+                    model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            self._model = model
         return self._model
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def _embed_remote(self, texts: List[str]) -> np.ndarray | None:
+        if not self.socket_path or self._model is not None or not texts:
+            return None
+        vectors = request_embeddings(self.socket_path, self.fingerprint, texts)
+        if vectors is None:
+            # No usable server; stop probing and load the model in-process.
+            self.socket_path = None
+            return None
+        return vectors
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Return L2-normalized float32 vectors of shape (len(texts), dim)."""
+        remote = self._embed_remote(texts)
+        if remote is not None:
+            return remote
+
         model = self._load()
-        vectors = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
-        return vectors.tolist()
+        # encode() already sorts the whole input by length before batching and
+        # restores the original order, so padding waste is bounded per call.
+        # Callers should pass one large list rather than pre-splitting it.
+        vectors = model.encode(
+            texts,
+            batch_size=ENCODE_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return vectors
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_texts([text])[0]
+
+
+def embedder_from_config(config: Config, use_server: bool = True) -> Embeddings:
+    """Build the configured embedder.
+
+    Pass use_server=False for bulk encoding (ingest): the server handles one
+    request at a time and exists to skip model startup on short runs, so large
+    batches would only queue behind it or hit its reply timeout.
+    """
+    return Embeddings(
+        config.embed_model,
+        num_threads=config.embed_threads,
+        quantize=config.embed_quantize,
+        socket_path=config.embed_socket if use_server else None,
+    )
+
+
+class CachedEmbeddings:
+    """Wrap an `Embeddings` with a persistent SQLite cache keyed by content hash.
+
+    Keys are sha256(fingerprint + "\\0" + text), so unchanged chunks are never
+    re-encoded across ingest runs and vectors from different models (or
+    quantized variants) never mix.
+    """
+
+    def __init__(self, embedder: Embeddings, cache_dir: str) -> None:
+        self.embedder = embedder
+        self.model_name = embedder.model_name
+        self.fingerprint = embedder.fingerprint
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(Path(cache_dir) / EMBEDDING_CACHE_FILENAME))
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache (hash TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _key(self, text: str) -> str:
+        return sha256(f"{self.fingerprint}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), _CACHE_QUERY_BATCH):
+            batch = unique_keys[start : start + _CACHE_QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT hash, vector FROM cache WHERE hash IN ({placeholders})", batch
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(keys)
+
+        missing: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key not in cached and key not in missing:
+                missing[key] = i
+
+        if missing:
+            vectors = self.embedder.embed_texts([texts[i] for i in missing.values()])
+            rows = []
+            for key, vector in zip(missing, vectors):
+                cached[key] = vector
+                rows.append((key, vector.tobytes()))
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO cache (hash, vector) VALUES (?, ?)", rows)
+
+        return np.stack([cached[key] for key in keys])
 
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         return self.embed_texts([text])[0]
 
+    def close(self) -> None:
+        self._conn.close()
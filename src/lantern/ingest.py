@@ -1,21 +1,68 @@
 from __future__ import annotations
 
 import json
+import mmap
+import os
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from hashlib import sha1
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List
 
 from .chunking import chunk_text
 from .config import Config
 from .documents import Document
-from .embeddings import Embeddings
+from .embeddings import CachedEmbeddings, Embeddings, embedder_from_config
 from .vectorstore import get_collection, upsert_documents
 
 
 SUPPORTED_EXTENSIONS = {".txt", ".md"}
 
+# File reads are I/O bound, so overlap them across threads.
+READ_WORKERS = 16
+# Files read ahead of the consumer; bounds how much text is held in memory.
+READ_AHEAD = 2 * READ_WORKERS
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+def _join_values(value: Any) -> str:
+    return ", ".join(str(v) for v in value if v is not None)
+
+
+def _dump_dict(value: dict) -> str:
+    try:
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    except Exception:
+        return str(value)
+
+
+def _sanitize_value(value: Any) -> Any:
+    # Slow path for subclasses (numpy scalars, enums, ...) missing from _SANITIZERS.
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return _join_values(value)
+    if isinstance(value, dict):
+        return _dump_dict(value)
+    return str(value)
+
+
+_SANITIZERS: Dict[type, Callable[[Any], Any]] = {
+    str: _passthrough,
+    int: _passthrough,
+    float: _passthrough,
+    bool: _passthrough,
+    list: _join_values,
+    tuple: _join_values,
+    set: _join_values,
+    dict: _dump_dict,
+}
+
 
 def sanitize_metadata(metadata: dict) -> dict:
     """Sanitize metadata for Chroma.
@@ -30,66 +77,85 @@ def sanitize_metadata(metadata: dict) -> dict:
     for key, value in (metadata or {}).items():
         if value is None:
             continue
-
-        if isinstance(value, (str, int, float, bool)):
-            clean[key] = value
-            continue
-
-        if isinstance(value, (list, tuple, set)):
-            parts = [str(v) for v in value if v is not None]
-            clean[key] = ", ".join(parts)
-            continue
-
-        if isinstance(value, dict):
-            try:
-                clean[key] = json.dumps(value, ensure_ascii=False, sort_keys=True)
-            except Exception:
-                clean[key] = str(value)
-            continue
-
-        clean[key] = str(value)
+        clean[key] = _SANITIZERS.get(type(value), _sanitize_value)(value)
 
     return clean
 
 
-def load_documents_from_folder(path: Path) -> List[Document]:
-    documents: List[Document] = []
-    for file_path in path.rglob("*"):
-        if not file_path.is_file():
-            continue
-        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            continue
-
-        text = file_path.read_text(encoding="utf-8", errors="ignore")
-        stat = file_path.stat()
-        metadata = {
-            "source_path": str(file_path),
-            "file_name": file_path.name,
-            "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-        }
-        documents.append(Document(text=text, metadata=metadata))
-    return documents
-
-
-def _chunk_id(source_path: str, chunk_index: int) -> str:
-    raw = f"{source_path}:{chunk_index}".encode("utf-8")
-    return sha1(raw).hexdigest()
+def _read_document(file_path: Path) -> Document:
+    # Decode straight from a read-only mapping of the page cache instead of
+    # copying the file into a bytes object first.
+    with open(file_path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        if stat.st_size == 0:
+            text = ""
+        else:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, "utf-8", "ignore")
+    if "\r" in text:
+        # Match text-mode reads (universal newlines).
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    metadata = {
+        "source_path": str(file_path),
+        "file_name": file_path.name,
+        "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+    }
+    return Document(text=text, metadata=metadata)
+
+
+def load_documents_from_folder(path: Path) -> Iterator[Document]:
+    """Yield documents in listing order, reading at most READ_AHEAD files ahead."""
+    file_paths = (
+        file_path
+        for file_path in path.rglob("*")
+        if file_path.suffix.lower() in SUPPORTED_EXTENSIONS and file_path.is_file()
+    )
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+        pending: Deque[Future[Document]] = deque()
+        for file_path in file_paths:
+            pending.append(pool.submit(_read_document, file_path))
+            if len(pending) >= READ_AHEAD:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunk_ids(source_path: str, count: int) -> List[str]:
+    """Return sha1(f"{source_path}:{index}") for each chunk index.
+
+    The path prefix is hashed once and the context copied per chunk.
+    """
+    base = sha1(f"{source_path}:".encode("utf-8"))
+    ids: List[str] = []
+    for index in range(count):
+        digest = base.copy()
+        digest.update(str(index).encode("ascii"))
+        ids.append(digest.hexdigest())
+    return ids
 
 
 def ingest_documents(
     documents: Iterable[Document],
-    embedder: Embeddings,
+    embedder: Embeddings | CachedEmbeddings,
     config: Config,
     chunk_size: int = 800,
     overlap: int = 100,
-    batch_size: int = 64,
+    batch_size: int = 512,
+    max_single_batch: int = 2048,
 ) -> int:
+    """Chunk, embed and upsert `documents`; returns the number of chunks.
+
+    Corpora of up to `max_single_batch` chunks (e.g. a typical Asana snapshot)
+    are embedded and upserted in one call. Larger inputs stream through in
+    `batch_size` flushes after that first block.
+    """
     collection = get_collection(config.chroma_dir)
 
     ids: List[str] = []
     texts: List[str] = []
     metadatas: List[dict] = []
     total_chunks = 0
+    flush_at = max(max_single_batch, batch_size)
 
     def flush() -> None:
         nonlocal ids, texts, metadatas
@@ -101,18 +167,18 @@ def ingest_documents(
 
     for doc in documents:
         chunks = chunk_text(doc.text, chunk_size=chunk_size, overlap=overlap)
-        for index, chunk in enumerate(chunks):
-            chunk_id = _chunk_id(doc.metadata.get("source_path", ""), index)
-            metadata = dict(doc.metadata)
-            metadata.update({"chunk_index": index, "chunk_id": chunk_id})
-
+        # Only chunk_index/chunk_id vary per chunk; sanitize the rest once.
+        base_metadata = sanitize_metadata(doc.metadata)
+        chunk_ids = _chunk_ids(doc.metadata.get("source_path", ""), len(chunks))
+        for index, (chunk, chunk_id) in enumerate(zip(chunks, chunk_ids)):
             ids.append(chunk_id)
             texts.append(chunk)
-            metadatas.append(sanitize_metadata(metadata))
+            metadatas.append({**base_metadata, "chunk_index": index, "chunk_id": chunk_id})
             total_chunks += 1
 
-            if len(ids) >= batch_size:
+            if len(ids) >= flush_at:
                 flush()
+                flush_at = batch_size
 
     flush()
     return total_chunks
@@ -120,5 +186,8 @@ def ingest_documents(
 
 def ingest_folder(path: Path, config: Config) -> int:
     documents = load_documents_from_folder(path)
-    embedder = Embeddings(config.embed_model)
-    return ingest_documents(documents, embedder, config)
+    embedder = CachedEmbeddings(embedder_from_config(config, use_server=False), config.chroma_dir)
+    try:
+        return ingest_documents(documents, embedder, config)
+    finally:
+        embedder.close()
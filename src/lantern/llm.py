@@ -14,13 +14,18 @@ _client: OpenAI | None = None
 def _get_client(config: Config) -> OpenAI:
     global _client
 
+    _ensure_llm_config(config)
+
     if _client is not None:
         return _client
 
-    _ensure_llm_config(config)
-
     # Force a vanilla httpx client (no proxy kwargs passed through OpenAI internals).
-    http_client = httpx.Client(timeout=60.0)
+    # HTTP/2 plus keep-alive lets repeated calls reuse one TCP/TLS connection.
+    http_client = httpx.Client(
+        timeout=60.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    )
 
     _client = OpenAI(
         api_key=config.llm_api_key or "local-key",
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from pathlib import Path
+import shelve
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+from urllib.parse import urlencode
 
 import httpx
+import orjson
 
 from datetime import date, timedelta
 
@@ -15,6 +25,17 @@ ASANA_BASE_URL = "https://app.asana.com/api/1.0"
 # Custom field gid for "Estimated Time (Yoko)".
 ESTIMATED_TIME_FIELD_GID = "1136060183433384"
 
+ASANA_CACHE_FILENAME = "asana_cache.db"
+
+# Rate limits and gateway hiccups are transient; retry them before failing the load.
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+MAX_ATTEMPTS = 6
+
+logger = logging.getLogger(__name__)
+
+# One pooled client per PAT, reused across loads in the same process.
+_clients: Dict[str, httpx.Client] = {}
+
 
 def _ensure_asana_config(config: Config) -> None:
     if not config.asana_pat:
@@ -33,43 +54,126 @@ def _asana_headers(config: Config) -> Dict[str, str]:
     return {"Authorization": f"Bearer {config.asana_pat}"}
 
 
-def _opt_fields() -> str:
-    return ",".join(
-        [
-            "gid",
-            "name",
-            "notes",
-            "completed",
-            "completed_on",
-            "due_on",
-            "due_at",
-            "assignee.name",
-            "assignee.gid",
-            "assignee_section.gid",
-            "assignee_section.name",
-            "projects.name",
-            "projects.gid",
-            "memberships.project.gid",
-            "memberships.project.name",
-            "memberships.section.gid",
-            "memberships.section.name",
-            "custom_fields.gid",
-            "custom_fields.name",
-            "custom_fields.type",
-            "custom_fields.number_value",
-            "custom_fields.text_value",
-            "custom_fields.enum_value.gid",
-            "custom_fields.enum_value.name",
-            "permalink_url",
-        ]
-    )
+def _get_client(config: Config) -> httpx.Client:
+    # HTTP/2 plus keep-alive lets every page (and both searches) share one
+    # TCP/TLS connection instead of handshaking per load.
+    client = _clients.get(config.asana_pat)
+    if client is None:
+        client = httpx.Client(
+            base_url=ASANA_BASE_URL,
+            headers=_asana_headers(config),
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+        )
+        _clients[config.asana_pat] = client
+        atexit.register(client.close)
+    return client
+
+
+# Requested once per page; build the field list a single time.
+_OPT_FIELDS: str = ",".join(
+    [
+        "gid",
+        "name",
+        "notes",
+        "completed",
+        "completed_on",
+        "due_on",
+        "due_at",
+        "assignee.name",
+        "assignee.gid",
+        "assignee_section.gid",
+        "assignee_section.name",
+        "projects.name",
+        "projects.gid",
+        "memberships.project.gid",
+        "memberships.project.name",
+        "memberships.section.gid",
+        "memberships.section.name",
+        "custom_fields.gid",
+        "custom_fields.name",
+        "custom_fields.type",
+        "custom_fields.number_value",
+        "custom_fields.text_value",
+        "custom_fields.enum_value.gid",
+        "custom_fields.enum_value.name",
+        "permalink_url",
+    ]
+)
+
+
+# Line prefixes of the task text, in the order _task_to_document passes values.
+_TEXT_LABELS = (
+    "Task: ",
+    "Completed: ",
+    "Completed on: ",
+    "Due on: ",
+    "Due at: ",
+    "Assignee: ",
+    "Projects: ",
+    "Assignee section gid: ",
+    "Assignee section: ",
+    "Assignee section (global) gid: ",
+    "Assignee section (global): ",
+    "Estimated Time (Yoko): ",
+    "Permalink: ",
+)
+
+
+class _PageCache:
+    """Parsed search pages keyed by search and page number, revalidated with ETags.
+
+    A 304 reply reuses the stored payload, skipping both the download and the
+    JSON parse. Shared by the fetch threads, so access is serialized. Entries
+    a run does not request are dropped by `prune`, so the file only ever holds
+    the latest pages of the current searches.
+    """
 
+    def __init__(self, cache_dir: str) -> None:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self._path = str(Path(cache_dir) / ASANA_CACHE_FILENAME)
+        self._shelf = shelve.open(self._path)
+        self._lock = threading.Lock()
+        self._touched: Set[str] = set()
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any], page_index: int) -> str:
+        # Not keyed by the offset cursor, which differs from run to run.
+        return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}#{page_index}"
+
+    def get(self, key: str) -> Tuple[str, Dict[str, Any]] | None:
+        with self._lock:
+            self._touched.add(key)
+            return self._shelf.get(key)
+
+    def put(self, key: str, etag: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._touched.add(key)
+            self._shelf[key] = (etag, payload)
+
+    def prune(self) -> None:
+        """Keep only the entries requested during this run.
+
+        dbm files don't shrink on delete, so the kept entries are rewritten
+        into a fresh file rather than deleting stale keys in place.
+        """
+        with self._lock:
+            kept = {key: self._shelf[key] for key in self._touched if key in self._shelf}
+            self._shelf.close()
+            self._shelf = shelve.open(self._path, flag="n")
+            self._shelf.update(kept)
+
+    def close(self) -> None:
+        with self._lock:
+            self._shelf.close()
 
 
 def _extract_estimated_time(task: Dict[str, Any]) -> float | None:
     custom_fields = task.get("custom_fields") or []
     for field in custom_fields:
-        if str(field.get("gid")) != ESTIMATED_TIME_FIELD_GID:
+        # Asana always returns gids as JSON strings, so compare without str().
+        if field.get("gid") != ESTIMATED_TIME_FIELD_GID:
             continue
         number_value = field.get("number_value")
         if isinstance(number_value, (int, float)):
@@ -83,87 +187,129 @@ def _extract_estimated_time(task: Dict[str, Any]) -> float | None:
     return None
 
 
+def _intern(value: Any) -> Any:
+    # Assignees, sections, projects and dates repeat across most tasks; share
+    # one string object per value instead of one per task.
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _as_str(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
 def _extract_memberships(task: Dict[str, Any]) -> Dict[str, Any]:
-    memberships = task.get("memberships") or []
-    project_gids: List[str] = []
-    project_names: List[str] = []
-    section_gids: List[str] = []
-    section_names: List[str] = []
-
-    for mem in memberships:
-        proj = mem.get("project") or {}
-        sec = mem.get("section") or {}
-
-        pgid = proj.get("gid")
-        pname = proj.get("name")
-        sgid = sec.get("gid")
-        sname = sec.get("name")
-
-        if pgid:
-            project_gids.append(str(pgid))
-        if pname:
-            project_names.append(str(pname))
-        if sgid:
-            section_gids.append(str(sgid))
-        if sname:
-            section_names.append(str(sname))
+    """Summarize memberships in one pass.
+
+    `by_project` maps each project gid to its (section gid, section name),
+    keeping the first membership per project.
+    """
+    pairs = [(mem.get("project") or {}, mem.get("section") or {}) for mem in task.get("memberships") or []]
+    projects = [proj for proj, _ in pairs]
+    sections = [sec for _, sec in pairs]
+
+    by_project: Dict[str, Tuple[str | None, str | None]] = {}
+    for proj, sec in pairs:
+        if proj.get("gid"):
+            section_gid = sec.get("gid")
+            by_project.setdefault(_as_str(proj["gid"]), (str(section_gid) if section_gid else None, sec.get("name")))
 
     return {
-        "membership_project_gids": project_gids,
-        "membership_project_names": project_names,
-        "membership_section_gids": section_gids,
-        "membership_section_names": section_names,
+        "membership_project_gids": [_as_str(proj["gid"]) for proj in projects if proj.get("gid")],
+        "membership_project_names": [_as_str(proj["name"]) for proj in projects if proj.get("name")],
+        "membership_section_gids": [_as_str(sec["gid"]) for sec in sections if sec.get("gid")],
+        "membership_section_names": [_as_str(sec["name"]) for sec in sections if sec.get("name")],
+        "by_project": by_project,
     }
 
 
-def _assignee_section_for_project(task: Dict[str, Any], project_gid: str | None) -> tuple[str | None, str | None]:
-    if not project_gid:
-        return None, None
-    memberships = task.get("memberships") or []
-    for mem in memberships:
-        proj = mem.get("project") or {}
-        if str(proj.get("gid")) != str(project_gid):
-            continue
-        sec = mem.get("section") or {}
-        return (str(sec.get("gid")) if sec.get("gid") else None, sec.get("name"))
-    return None, None
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return float(2**attempt)
 
 
+def _get_with_retry(client: httpx.Client, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+    for attempt in range(MAX_ATTEMPTS):
+        response = client.get(url, params=params, headers=headers)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_ATTEMPTS - 1:
+            break
+        delay = _retry_delay(response, attempt)
+        logger.warning(
+            "Asana returned %s; retry %d/%d in %.1fs.",
+            response.status_code,
+            attempt + 1,
+            MAX_ATTEMPTS - 1,
+            delay,
+        )
+        time.sleep(delay)
+    return response
 
 
-def _fetch_paginated(
+def _iter_pages(
     client: httpx.Client,
     url: str,
     params: Dict[str, Any],
     total_limit: int,
-) -> List[Dict[str, Any]]:
-    tasks: List[Dict[str, Any]] = []
-    offset: str | None = None
-    per_page = min(100, total_limit)
-
-    while len(tasks) < total_limit:
-        request_params = dict(params)
-        request_params["limit"] = per_page
+    cache: _PageCache | None = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of tasks, requesting each page while the previous one is consumed.
+
+    Asana's offsets are opaque cursors, so pages cannot be requested out of
+    order; the next GET is issued as soon as its offset is known.
+    """
+    if total_limit <= 0:
+        # Asana rejects limit=0, and there is nothing to fetch anyway.
+        return
+
+    fetched = 0
+    # Only the offset changes between pages. Requests run one at a time, each
+    # submitted after the previous one returned, so mutating in place is safe.
+    request_params = dict(params)
+    request_params["limit"] = min(100, total_limit)
+    search_params = dict(request_params)
+
+    def get_page(offset: str | None, page_index: int) -> Dict[str, Any]:
         if offset:
             request_params["offset"] = offset
 
-        response = client.get(url, params=request_params)
+        cache_key = cached = None
+        headers: Dict[str, str] = {}
+        if cache is not None:
+            cache_key = _PageCache.key(url, search_params, page_index)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        response = _get_with_retry(client, url, request_params, headers)
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
         response.raise_for_status()
-        payload = response.json()
+        # orjson decodes the nested task payloads markedly faster than stdlib json.
+        payload = orjson.loads(response.content)
 
-        page_data = payload.get("data", [])
-        tasks.extend(page_data)
-        if len(tasks) >= total_limit:
-            break
+        etag = response.headers.get("ETag")
+        if cache is not None and etag:
+            cache.put(cache_key, etag, payload)
+        return payload
 
-        next_page = payload.get("next_page")
-        if not next_page:
-            break
-        offset = next_page.get("offset")
-        if not offset:
-            break
+    page_index = 0
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = prefetch.submit(get_page, None, page_index)
+        while pending is not None:
+            payload = pending.result()
+            pending = None
+
+            page_data = payload.get("data", [])[: total_limit - fetched]
+            fetched += len(page_data)
 
-    return tasks[:total_limit]
+            next_page = payload.get("next_page") or {}
+            offset = next_page.get("offset")
+            if offset and fetched < total_limit:
+                page_index += 1
+                pending = prefetch.submit(get_page, offset, page_index)
+
+            yield page_data
 
 
 def _task_to_document(task: Dict[str, Any], config: Config) -> Document:
@@ -192,69 +338,90 @@ def _task_to_document(task: Dict[str, Any], config: Config) -> Document:
     project_names = [project.get("name") for project in projects if project.get("name")]
 
     memberships_info = _extract_memberships(task)
-    assignee_section_gid, assignee_section_name = _assignee_section_for_project(task, config.asana_project_gid)
+    assignee_section_gid, assignee_section_name = (
+        memberships_info["by_project"].get(str(config.asana_project_gid), (None, None))
+        if config.asana_project_gid
+        else (None, None)
+    )
     estimated_time_yoko = _extract_estimated_time(task)
 
     doc_id = f"asana:task:{gid}"
 
-    lines = [
-        f"Task: {name}",
-        f"Completed: {completed}",
-        f"Completed on: {completed_on}",
-        f"Due on: {due_on}",
-        f"Due at: {due_at}",
-        f"Assignee: {assignee_label}",
-        f"Projects: {', '.join(project_names) if project_names else 'None'}",
-        f"Assignee section gid: {assignee_section_gid}",
-        f"Assignee section: {assignee_section_name}",
-        f"Assignee section (global) gid: {assignee_section_gid_global}",
-        f"Assignee section (global): {assignee_section_name_global}",
-        f"Estimated Time (Yoko): {estimated_time_yoko}",
-        f"Permalink: {permalink_url}",
-        "",
-        "Notes:",
-        notes,
-    ]
-    text = "\n".join(line for line in lines if line is not None)
+    values = (
+        name,
+        completed,
+        completed_on,
+        due_on,
+        due_at,
+        assignee_label,
+        ", ".join(project_names) if project_names else "None",
+        assignee_section_gid,
+        assignee_section_name,
+        assignee_section_gid_global,
+        assignee_section_name_global,
+        estimated_time_yoko,
+        permalink_url,
+    )
+    # Only render the fields that are set; unset ones are left out of the text.
+    header = "\n".join([label + str(value) for label, value in zip(_TEXT_LABELS, values) if value is not None])
+    text = f"{header}\n\nNotes:\n{notes}"
 
+    # source_path doubles as the doc id and file_name as the task name; Chroma
+    # stores every key per chunk, so don't repeat them under other names.
     metadata = {
-        "doc_id": doc_id,
         "source_type": "asana",
         "source_path": doc_id,
         "file_name": name,
         "asana_task_gid": gid,
         "asana_permalink_url": permalink_url,
-        "task_name": name,
         "completed": completed,
-        "completed_on": completed_on,
-        "due_on": due_on,
+        "completed_on": _intern(completed_on),
+        "due_on": _intern(due_on),
         "due_at": due_at,
-        "assignee_name": assignee_name,
-        "assignee_gid": assignee_gid,
-        "assignee_section_gid_global": assignee_section_gid_global,
-        "assignee_section_name_global": assignee_section_name_global,
-        "project_gids": ", ".join(project_gids),
-        "project_names": ", ".join(project_names),
+        "assignee_name": _intern(assignee_name),
+        "assignee_gid": _intern(assignee_gid),
+        "assignee_section_gid_global": _intern(assignee_section_gid_global),
+        "assignee_section_name_global": _intern(assignee_section_name_global),
+        "project_gids": _intern(", ".join(project_gids)),
+        "project_names": _intern(", ".join(project_names)),
         "workspace_gid": config.asana_workspace_gid,
     }
 
     return Document(text=text, metadata=metadata)
 
 
+def _fetch_documents(
+    client: httpx.Client,
+    url: str,
+    params: Dict[str, Any],
+    config: Config,
+    cache: _PageCache | None = None,
+) -> List[Tuple[str, Document]]:
+    """Run one search and convert each page while the next one downloads."""
+    documents: List[Tuple[str, Document]] = []
+    for page in _iter_pages(client, url, params, config.asana_limit, cache):
+        for task in page:
+            gid = str(task.get("gid") or "")
+            if gid:
+                documents.append((gid, _task_to_document(task, config)))
+    return documents
+
+
 def load_asana_tasks(config: Config) -> List[Document]:
     """Load Asana tasks.
 
     Strategy:
     - Use the workspace task search endpoint for both project-scoped and user-scoped pulls.
-    - Fetch (A) incomplete tasks and (B) tasks completed within the last N days (default 7).
+    - Fetch (A) incomplete tasks and (B) tasks completed within the last N days (default 7),
+      concurrently since the two searches are independent. (B) is skipped when N <= 0.
+    - Revalidate previously seen pages with their ETag (cached under chroma_dir;
+      pages this run did not request are dropped).
+    - Convert each page to Documents while the next page downloads.
     - Merge and de-duplicate by gid.
     """
     _ensure_asana_config(config)
 
-    headers = _asana_headers(config)
-    opt_fields = _opt_fields()
-
-    scope_params: Dict[str, Any] = {"opt_fields": opt_fields}
+    scope_params: Dict[str, Any] = {"opt_fields": _OPT_FIELDS}
 
     if config.asana_project_gid:
         scope_params["projects.any"] = config.asana_project_gid
@@ -265,26 +432,35 @@ def load_asana_tasks(config: Config) -> List[Document]:
     lookback_days = getattr(config, "asana_completed_lookback_days", 7)
     completed_after = (today - timedelta(days=lookback_days)).isoformat()
 
-    results_by_gid: Dict[str, Dict[str, Any]] = {}
-
-    with httpx.Client(base_url=ASANA_BASE_URL, headers=headers, timeout=30.0) as client:
-        search_url = f"/workspaces/{config.asana_workspace_gid}/tasks/search"
+    search_url = f"/workspaces/{config.asana_workspace_gid}/tasks/search"
 
-        params_incomplete = dict(scope_params)
-        params_incomplete["completed"] = False
-        tasks_incomplete = _fetch_paginated(client, search_url, params_incomplete, config.asana_limit)
-        for task in tasks_incomplete:
-            gid = str(task.get("gid") or "")
-            if gid:
-                results_by_gid[gid] = task
+    params_incomplete = dict(scope_params)
+    params_incomplete["completed"] = False
+    searches = [params_incomplete]
 
+    # Search can't OR "incomplete" with "completed since", so recently
+    # completed tasks need their own query; skip it when there is no lookback.
+    if lookback_days > 0:
         params_completed = dict(scope_params)
         params_completed["completed"] = True
         params_completed["completed_on.after"] = completed_after
-        tasks_completed = _fetch_paginated(client, search_url, params_completed, config.asana_limit)
-        for task in tasks_completed:
-            gid = str(task.get("gid") or "")
-            if gid:
-                results_by_gid[gid] = task
-
-    return [_task_to_document(task, config) for task in results_by_gid.values()]
\ No newline at end of file
+        searches.append(params_completed)
+
+    client = _get_client(config)
+    cache = _PageCache(config.chroma_dir)
+    try:
+        with ThreadPoolExecutor(max_workers=len(searches)) as pool:
+            futures = [
+                pool.submit(_fetch_documents, client, search_url, params, config, cache)
+                for params in searches
+            ]
+            # Later searches win, so a task completed since it was listed as
+            # incomplete keeps its completed version.
+            documents_by_gid: Dict[str, Document] = {}
+            for future in futures:
+                documents_by_gid.update(future.result())
+        cache.prune()
+    finally:
+        cache.close()
+
+    return list(documents_by_gid.values())
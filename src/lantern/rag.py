@@ -1,32 +1,54 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any, Dict, List
 from datetime import date
 
 from .config import Config
-from .embeddings import Embeddings
-from .vectorstore import get_collection, query_collection
+from .embeddings import Embeddings, embedder_from_config
+from .vectorstore import fetch_documents, get_collection, query_collection
 from .llm import generate_answer
 
 
+_PROMPT_PREAMBLE = (
+    "You are a helpful assistant. Use ONLY the provided context to answer the question. "
+    "If the answer is not in the context, say you don't know.\n\n"
+    "Context:\n"
+)
+_PROMPT_SUFFIX = "\n\nAnswer in a short response and include citations like [1]."
+
+
+@lru_cache(maxsize=2)
+def _get_embedder(config: Config) -> Embeddings:
+    # Keep the loaded model across questions instead of reloading it per call.
+    return embedder_from_config(config)
+
 
 def retrieve(
-    query: str,
+    queries: str | List[str],
     embedder: Embeddings,
     config: Config,
     top_k: int = 6,
-) -> List[Dict[str, Any]]:
+) -> List[Dict[str, Any]] | List[List[Dict[str, Any]]]:
+    """Return the top hits for a query, or one hit list per query for a list.
+
+    A list of queries is embedded in one batch and searched in one call. The
+    search returns ids only; bodies are then loaded in one lookup by id.
+    """
+    single = isinstance(queries, str)
+    query_list = [queries] if single else list(queries)
+    if not query_list:
+        return []
+
     collection = get_collection(config.chroma_dir)
-    query_embedding = embedder.embed_query(query)
-    results = query_collection(collection, query_embedding, top_k=top_k)
+    query_embeddings = embedder.embed_texts(query_list)
+    results = query_collection(collection, query_embeddings, top_k=top_k, light=True)
 
-    documents = results.get("documents", [[]])[0]
-    metadatas = results.get("metadatas", [[]])[0]
+    ids_per_query: List[List[str]] = results.get("ids") or [[] for _ in query_list]
+    bodies = fetch_documents(collection, list(dict.fromkeys(i for ids in ids_per_query for i in ids)))
 
-    hits: List[Dict[str, Any]] = []
-    for text, metadata in zip(documents, metadatas):
-        hits.append({"text": text, "metadata": metadata})
-    return hits
+    hits_per_query = [[bodies[i] for i in ids if i in bodies] for ids in ids_per_query]
+    return hits_per_query[0] if single else hits_per_query
 
 
 def build_prompt(query: str, hits: List[Dict[str, Any]]) -> str:
@@ -37,13 +59,7 @@ def build_prompt(query: str, hits: List[Dict[str, Any]]) -> str:
         context_lines.append(f"[{idx}] Source: {source}\n{hit.get('text', '')}")
 
     context_block = "\n\n".join(context_lines)
-    return (
-        "You are a helpful assistant. Use ONLY the provided context to answer the question. "
-        "If the answer is not in the context, say you don't know.\n\n"
-        f"Context:\n{context_block}\n\n"
-        f"Question: {query}\n\n"
-        "Answer in a short response and include citations like [1]."
-    )
+    return "".join((_PROMPT_PREAMBLE, context_block, "\n\nQuestion: ", query, _PROMPT_SUFFIX))
 
 
 def _is_overdue(hit: Dict[str, Any], today: date) -> bool:
@@ -68,7 +84,7 @@ def _is_overdue(hit: Dict[str, Any], today: date) -> bool:
 
 def answer_question(query: str, config: Config, top_k: int = 6) -> str:
     today = date.today()
-    embedder = Embeddings(config.embed_model)
+    embedder = _get_embedder(config)
     hits = retrieve(query, embedder, config, top_k=top_k)
     prompt = build_prompt(query, hits)
     response = generate_answer(prompt, config)
@@ -1,45 +1,79 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
 import chromadb
+import numpy as np
 
 
 COLLECTION_NAME = "lantern_docs"
 
 
+@lru_cache(maxsize=4)
 def get_collection(chroma_dir: str):
+    """Open (or create) the document collection, once per directory per process.
+
+    Embeddings are L2-normalized at encode time, so new collections use inner
+    product distance. Collections created earlier keep their L2 space, which
+    ranks unit vectors identically.
+    """
     Path(chroma_dir).mkdir(parents=True, exist_ok=True)
     client = chromadb.PersistentClient(
         path=chroma_dir,
         settings=chromadb.Settings(anonymized_telemetry=False)
     )
-    return client.get_or_create_collection(name=COLLECTION_NAME)
+    return client.get_or_create_collection(name=COLLECTION_NAME, metadata={"hnsw:space": "ip"})
 
 
 def upsert_documents(
     collection,
     ids: List[str],
-    embeddings: List[List[float]],
+    embeddings: np.ndarray,
     documents: List[str],
     metadatas: List[Dict[str, Any]],
+    batch_size: int = 1024,
 ) -> None:
-    collection.upsert(
-        ids=ids,
-        embeddings=embeddings,
-        documents=documents,
-        metadatas=metadatas,
-    )
+    """Upsert in slices of `batch_size` to bound each Chroma/SQLite write."""
+    # Chroma converts anything else (lists, float64, strided views) row by row.
+    # This is a no-op for the float32 matrices the embedders already return.
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        collection.upsert(
+            ids=ids[start:end],
+            embeddings=embeddings[start:end],
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+        )
 
 
 def query_collection(
     collection,
-    query_embedding: List[float],
+    query_embeddings: np.ndarray,
     top_k: int = 6,
+    light: bool = False,
 ) -> Dict[str, Any]:
+    """Search for one query vector or a (n, dim) batch in a single call.
+
+    Results hold one list per query, in input order. With `light`, only ids
+    and distances come back; load the bodies with `fetch_documents`.
+    """
+    include = ["distances"] if light else ["documents", "metadatas", "distances"]
     return collection.query(
-        query_embeddings=[query_embedding],
+        query_embeddings=np.atleast_2d(query_embeddings),
         n_results=top_k,
-        include=["documents", "metadatas", "distances"],
+        include=include,
     )
+
+
+def fetch_documents(collection, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Load documents and metadata for `ids` by primary key, keyed by id."""
+    if not ids:
+        return {}
+    results = collection.get(ids=ids, include=["documents", "metadatas"])
+    return {
+        doc_id: {"text": text, "metadata": metadata}
+        for doc_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+    }